@@ -2,20 +2,56 @@
 import discord
 from discord.ext import commands, tasks
 import asyncio
+import collections
+import contextlib
+import csv
+import enum
+import gzip
+import hashlib
+import heapq
+import io
+import itertools
+import math
 import re
 import json
 import os
-from datetime import datetime
+import sys
+import tempfile
+import threading
+import time
+import traceback
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+from types import MappingProxyType
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from aiohttp import web
 import a2s
 import pytz
+from rcon import RconClient, RconError, parse_rcon_players
 
 # Load environment variables
 load_dotenv()
+STARTED_AT = time.monotonic()
+startup_phases = {}
+
+@contextlib.contextmanager
+def startup_phase(name):
+    """Record how long a startup phase took, in seconds, under `startup_phases[name]`"""
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        startup_phases[name] = round(time.monotonic() - started, 3)
 
 # Constants
 CONFIG_FILE = 'config.json'
-STEAM_PROFILE_REGEX = re.compile(r'https?://steamcommunity\.com/(id|profiles)/[a-zA-Z0-9_-]+/?')
+COMMAND_SYNC_FILE = 'command_sync.txt'
+STEAM_PROFILE_REGEX = re.compile(r'https?://steamcommunity\.com/(id|profiles)/([a-zA-Z0-9_-]+)/?')
+# Values allowed into an RCON console command; anything else could break out of quoting
+RCON_ARGUMENT_REGEX = re.compile(r'[A-Za-z0-9_.-]+')
 DEFAULT_CONFIG = {
     "staff_roles": ["staff", "headstaff"],
     "member_role": "member",
@@ -27,9 +63,34 @@ DEFAULT_CONFIG = {
     "status_channel_id": "1374917255556628492",
     "server_name": "HotBoxInZ",
     "status_command_cooldown": 30,
-    "welcome_channel_id": "1374133331330990094"
+    "welcome_channel_id": "1374133331330990094",
+    "member_cache_policy": "lazy",
+    "application_commands": False,
+    "health_host": "127.0.0.1",
+    "health_port": 8080,
+    "archive_after_days": 30,
+    "archive_dir": "archive",
+    "rcon_host": "",
+    "rcon_port": 0,
+    "rcon_whitelist_command": "",
+    "loop_lag_threshold_ms": 250
 }
 
+# Discord embed size limits
+EMBED_FIELD_VALUE_LIMIT = 1024
+EMBED_TOTAL_LIMIT = 6000
+PLAYER_LIST_MAX_COLUMNS = 3
+
+# Minimum spacing between calls on the same route, keyed by route prefix
+ROUTE_MIN_INTERVALS = {
+    "message.delete": 1.2,
+    "message.edit": 1.0,
+    "member.roles": 0.25,
+    "user.dm": 0.5
+}
+BULK_CONCURRENCY = 5
+MEMBER_REFERENCE_REGEX = re.compile(r'<@!?(\d+)>|(\d{15,20})')
+
 # Initialize configuration
 def load_config():
     """Load configuration from file or create default"""
@@ -52,17 +113,257 @@ def load_config():
     print("Created default config:", DEFAULT_CONFIG)  # Debug print
     return DEFAULT_CONFIG
 
-config = load_config()
+with startup_phase("config"):
+    config = load_config()
 
 # Bot setup
+# "lazy" skips startup chunking and only caches members who join or are looked up;
+# "full" chunks and caches every guild member on connect.
+MEMBER_CACHE_POLICY = config.get("member_cache_policy", "lazy")
+# Registers commands as slash commands and drops the message content intent.
+# DMs (the application flow) and messages mentioning the bot still carry content.
+APPLICATION_COMMANDS = config.get("application_commands", False)
+
 intents = discord.Intents.default()
-intents.message_content = True
+intents.message_content = not APPLICATION_COMMANDS
 intents.members = True
-bot = commands.Bot(command_prefix='!', intents=intents, help_command=None)
+if MEMBER_CACHE_POLICY == "full":
+    member_cache_flags = discord.MemberCacheFlags.from_intents(intents)
+else:
+    member_cache_flags = discord.MemberCacheFlags.none()
+    member_cache_flags.joined = True
+bot = commands.Bot(
+    command_prefix=commands.when_mentioned_or('!') if APPLICATION_COMMANDS else '!',
+    intents=intents,
+    help_command=None,
+    member_cache_flags=member_cache_flags,
+    chunk_guilds_at_startup=MEMBER_CACHE_POLICY == "full"
+)
+
+# Outbound Request Scheduling
+class RequestPriority(enum.IntEnum):
+    """Outbound REST priority classes; lower values are dispatched first"""
+    INTERACTIVE = 0     # staff button clicks and commands
+    APPLICATION_DM = 1  # application outcome DMs and welcome messages
+    STATUS = 2          # status embed sends/edits
+    CLEANUP = 3         # status channel deletes
+
+class _OutboundJob:
+    __slots__ = ("priority", "factory", "route", "key", "future", "superseded")
+
+    def __init__(self, priority, factory, route, key, future):
+        self.priority = priority
+        self.factory = factory
+        self.route = route
+        self.key = key
+        self.future = future
+        self.superseded = False
+
+class OutboundScheduler:
+    """Orders outbound Discord calls so staff actions never wait behind background work.
+
+    Interactive calls run immediately and hold back background work while in flight.
+    Everything else is queued by priority in a lane per route, so a slow or spaced-out
+    route never holds up another; queuing a job with the same key as a still-pending one
+    drops the older job, and calls sharing a route are spaced by its minimum interval.
+    """
+
+    def __init__(self):
+        self._lanes = {}
+        self._workers = {}
+        self._seq = itertools.count()
+        self._pending = {}
+        self._route_ready_at = {}
+        self._interactive_calls = 0
+        self._interactive_idle = None
+
+    @property
+    def started(self):
+        return self._interactive_idle is not None
+
+    def start(self):
+        if self._interactive_idle is None:
+            self._interactive_idle = asyncio.Event()
+            self._interactive_idle.set()
+
+    async def run(self, priority, factory, route=None, key=None):
+        """Run `factory()` at the given priority and return its result (None if superseded)"""
+        if priority == RequestPriority.INTERACTIVE or not self.started:
+            return await self._run_interactive(factory, route)
+        return await self.submit(priority, factory, route=route, key=key)
+
+    def submit(self, priority, factory, route=None, key=None):
+        """Queue a background call without waiting for it and return its future"""
+        future = asyncio.get_running_loop().create_future()
+        if not self.started:
+            future.set_result(None)
+            return future
+        job = _OutboundJob(priority, factory, route, key, future)
+        if key is not None:
+            previous = self._pending.get(key)
+            if previous:
+                previous.superseded = True
+                if not previous.future.done():
+                    previous.future.set_result(None)
+            self._pending[key] = job
+        self._lane(route).put_nowait((priority, next(self._seq), job))
+        return future
+
+    def queued(self):
+        return sum(lane.qsize() for lane in self._lanes.values())
+
+    def _lane(self, route):
+        lane = self._lanes.get(route)
+        if lane is None:
+            lane = self._lanes[route] = asyncio.PriorityQueue()
+            self._workers[route] = asyncio.create_task(self._run_worker(lane))
+        return lane
+
+    async def _run_interactive(self, factory, route):
+        self._interactive_calls += 1
+        if self._interactive_idle:
+            self._interactive_idle.clear()
+        try:
+            await self._wait_for_route(route)
+            return await factory()
+        finally:
+            self._interactive_calls -= 1
+            if self._interactive_calls == 0 and self._interactive_idle:
+                self._interactive_idle.set()
+
+    async def _wait_for_route(self, route):
+        if not route:
+            return
+        interval = ROUTE_MIN_INTERVALS.get(route.split(":", 1)[0], 0)
+        now = time.monotonic()
+        ready_at = max(self._route_ready_at.get(route, now), now)
+        self._route_ready_at[route] = ready_at + interval
+        if ready_at > now:
+            await asyncio.sleep(ready_at - now)
+
+    async def _run_worker(self, lane):
+        while True:
+            _priority, _seq, job = await lane.get()
+            if job.superseded:
+                continue
+            await self._interactive_idle.wait()
+            if job.superseded:
+                continue
+            await self._wait_for_route(job.route)
+            # A newer job with the same key may have arrived while this one waited
+            if job.superseded:
+                continue
+            if job.key is not None and self._pending.get(job.key) is job:
+                del self._pending[job.key]
+            try:
+                result = await job.factory()
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+
+outbound = OutboundScheduler()
+
+# Fire-and-forget tasks are held here so they are not garbage-collected mid-run
+background_tasks = set()
+
+def spawn(coro):
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+# Event Loop Diagnostics
+LOOP_LAG_INTERVAL = 0.5
+LOOP_LAG_SAMPLES = 600  # five minutes of heartbeats
+PROFILE_SAMPLE_INTERVAL = 0.005
+PROFILE_MAX_SECONDS = 60
+
+class LoopLagMonitor:
+    """Records event loop heartbeat delay and logs the loop's stack when it stalls.
+
+    A heartbeat coroutine wakes every LOOP_LAG_INTERVAL seconds and records how late it
+    woke. A watchdog thread notices when no heartbeat has landed within the threshold and
+    prints the loop thread's current stack, which is the callback blocking it.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.samples = collections.deque(maxlen=LOOP_LAG_SAMPLES)
+        self.loop_thread_id = None
+        self._last_beat = time.monotonic()
+        self._reported_beat = None
+        self._task = None
+
+    def start(self):
+        if self._task and not self._task.done():
+            return
+        self.loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.create_task(self._heartbeat())
+        threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True).start()
+
+    def percentiles(self):
+        """Heartbeat delay in milliseconds over the sample window"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+
+        def pick(pct):
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000, 1)
+
+        return {"p50": pick(50), "p95": pick(95), "p99": pick(99), "max": round(ordered[-1] * 1000, 1)}
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + LOOP_LAG_INTERVAL
+            await asyncio.sleep(LOOP_LAG_INTERVAL)
+            now = time.monotonic()
+            self.samples.append(max(0.0, now - expected))
+            self._last_beat = now
+
+    def _watch(self):
+        while True:
+            time.sleep(self.threshold / 2)
+            last_beat = self._last_beat
+            stalled = time.monotonic() - last_beat - LOOP_LAG_INTERVAL
+            if stalled > self.threshold and self._reported_beat != last_beat:
+                # Report each stall once, while it is still in progress
+                self._reported_beat = last_beat
+                frame = sys._current_frames().get(self.loop_thread_id)
+                stack = "".join(traceback.format_stack(frame)) if frame else "unavailable\n"
+                print(f"Event loop stalled for {stalled * 1000:.0f} ms, running:\n{stack}", end="")
+
+def sample_stacks(thread_id, duration):
+    """Sample a thread's stack for `duration` seconds and return it in collapsed-stack format.
+
+    Each output line is "outer;...;inner count", as read by flamegraph.pl and speedscope.
+    """
+    counts = collections.Counter()
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        stack = []
+        while frame:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        if stack:
+            counts[";".join(reversed(stack))] += 1
+        time.sleep(PROFILE_SAMPLE_INTERVAL)
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+loop_monitor = LoopLagMonitor(config.get("loop_lag_threshold_ms", 250) / 1000)
+profiling = False
 
 # Data storage
 applications = {}
 server_status_message = None
+last_status_poll = None
+rcon = None
+ready_count = 0
 
 # Utility Functions
 def save_config(config):
@@ -74,21 +375,402 @@ def save_applications():
         json.dump(applications, f, indent=4)
 
 def load_applications():
+    """Load the application store, only rewriting it when old records needed defaults filled in"""
     global applications
-    if os.path.exists('applications.json'):
-        with open('applications.json', 'r') as f:
-            applications = json.load(f)
-        for app in applications.values():
-            app.setdefault("status", "pending")
-            app.setdefault("steam_link", "N/A")
-            app.setdefault("hours_played", "N/A")
-            app.setdefault("submitted_at", datetime.now().isoformat())
+    if not os.path.exists('applications.json'):
+        applications = {}
+        return
+    with open('applications.json', 'r') as f:
+        loaded = json.load(f)
+    defaults = {"status": "pending", "steam_link": "N/A", "hours_played": "N/A"}
+    migrated = False
+    for app in loaded.values():
+        for key, value in defaults.items():
+            if key not in app:
+                app[key] = value
+                migrated = True
+        if "submitted_at" not in app:
+            app["submitted_at"] = datetime.now().isoformat()
+            migrated = True
+    applications = loaded
+    if migrated:
         save_applications()
 
+# Application Archive
+ARCHIVE_SEGMENT_PREFIX = "applications-"
+ARCHIVE_SEGMENT_SUFFIX = ".jsonl.gz"
+
+def archive_segment_path(processed_at):
+    """Monthly segment for a record, e.g. archive/applications-2025-06.jsonl.gz"""
+    return os.path.join(config.get("archive_dir", "archive"), f"{ARCHIVE_SEGMENT_PREFIX}{processed_at[:7]}{ARCHIVE_SEGMENT_SUFFIX}")
+
+def append_to_archive(records):
+    """Append (user_id, application) pairs to their monthly gzip JSONL segments"""
+    segments = {}
+    for user_id, app in records:
+        processed_at = app.get("processed_at") or app["submitted_at"]
+        segments.setdefault(archive_segment_path(processed_at), []).append({"user_id": user_id, **app})
+    os.makedirs(config.get("archive_dir", "archive"), exist_ok=True)
+    for path, rows in segments.items():
+        # Every append adds a gzip member; readers decompress the segment as one stream
+        with gzip.open(path, 'at', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+
+def iter_archive(user_id):
+    """Stream a user's archived records, newest segment first, decompressing line by line"""
+    archive_dir = config.get("archive_dir", "archive")
+    if not os.path.isdir(archive_dir):
+        return
+    needle = f'"user_id": "{user_id}"'
+    segments = sorted(
+        (name for name in os.listdir(archive_dir)
+         if name.startswith(ARCHIVE_SEGMENT_PREFIX) and name.endswith(ARCHIVE_SEGMENT_SUFFIX)),
+        reverse=True
+    )
+    for name in segments:
+        matches = []
+        with gzip.open(os.path.join(archive_dir, name), 'rt', encoding='utf-8') as f:
+            for line in f:
+                # Cheap substring check so only candidate lines are parsed
+                if needle not in line:
+                    continue
+                record = json.loads(line)
+                if record.get("user_id") == user_id:
+                    matches.append(record)
+        # Segments are append-only, so the latest record for a user is the last line
+        yield from reversed(matches)
+
+def detach_applications(records):
+    """Drop (user_id, application) pairs from the store and index before they are archived"""
+    for user_id, app in records:
+        if applications.get(user_id) is app:
+            del applications[user_id]
+            app_index.remove(user_id)
+
+def restore_applications(records):
+    """Put detached records back after a failed archive write, unless the user reapplied"""
+    for user_id, app in records:
+        if user_id not in applications:
+            applications[user_id] = app
+            app_index.update(user_id, app)
+
+async def archive_expired_applications():
+    """Move approved/declined applications past the retention age into the archive"""
+    cutoff = datetime.now() - timedelta(days=config.get("archive_after_days", 30))
+    expired = [
+        (user_id, app) for user_id, app in applications.items()
+        if app["status"] in ("approved", "declined")
+        and "processed_at" in app
+        and datetime.fromisoformat(app["processed_at"]) < cutoff
+        # Cooldowns are rebuilt from the store, so declines stay until theirs runs out
+        and not cooldowns.remaining(user_id)
+    ]
+    if not expired:
+        return 0
+    # Detach before the write so a reapply meanwhile cannot archive the same record again
+    detach_applications(expired)
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, append_to_archive, expired)
+    except OSError:
+        restore_applications(expired)
+        raise
+    save_applications()
+    return len(expired)
+
+# Application Export
+EXPORT_COLUMNS = ["user_id", "username", "status", "steam_link", "hours_played",
+                  "submitted_at", "processed_by", "processed_at", "reason"]
+EXPORT_BATCH_SIZE = 50
+EXPORT_NAME_CONCURRENCY = 5
+UPLOAD_OVERHEAD = 64 * 1024
+
+def iter_export_applications(status, since):
+    """Yield matching (user_id, application) pairs; only the key list is snapshotted"""
+    for user_id in list(applications):
+        app = applications.get(user_id)
+        if app is None:
+            continue
+        if status != "all" and app["status"] != status:
+            continue
+        if since and app["submitted_at"][:10] < since:
+            continue
+        yield user_id, app
+
+async def resolve_usernames(batch):
+    """Usernames for (user_id, application) pairs: the stored applicant name, then the user cache,
+    then a direct fetch with bounded concurrency"""
+    semaphore = asyncio.Semaphore(EXPORT_NAME_CONCURRENCY)
+
+    async def resolve(user_id, app):
+        if app.get("applicant_name"):
+            return app["applicant_name"]
+        user = bot.get_user(int(user_id))
+        if user:
+            return user.name
+        async with semaphore:
+            try:
+                user = await bot.fetch_user(int(user_id))
+            except discord.HTTPException:
+                return ""
+        return user.name
+
+    return await asyncio.gather(*(resolve(user_id, app) for user_id, app in batch))
+
+class ExportWriter:
+    """Streams rows into temp files, starting a new part before one would pass `max_bytes`"""
+
+    def __init__(self, fmt, compress, max_bytes):
+        self.fmt = fmt
+        self.compress = compress
+        self.max_bytes = max_bytes
+        self.paths = []
+        self._raw = None
+        self._stream = None
+
+    def write_rows(self, rows):
+        if self._stream is None:
+            self._open_part()
+        # Gzip output size is only known after a flush, so flush once per batch and
+        # count this batch's uncompressed bytes on top as an upper bound
+        base, pending = self._size(), 0
+        for row in rows:
+            line = self._encode(row)
+            if self._has_rows and base + pending + len(line) > self.max_bytes:
+                self._close_part()
+                self._open_part()
+                base, pending = self._size(), 0
+            self._stream.write(line)
+            self._has_rows = True
+            pending += len(line)
+
+    def close(self):
+        if self._stream is not None:
+            self._close_part()
+        return self.paths
+
+    def cleanup(self):
+        self.close()
+        for path in self.paths:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+    def _encode(self, row):
+        if self.fmt == "jsonl":
+            return (json.dumps(row) + "\n").encode("utf-8")
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow([row.get(column, "") for column in EXPORT_COLUMNS])
+        return buffer.getvalue().encode("utf-8")
+
+    def _open_part(self):
+        suffix = f".{self.fmt}" + (".gz" if self.compress else "")
+        fd, path = tempfile.mkstemp(prefix="applications-", suffix=suffix)
+        self.paths.append(path)
+        self._raw = os.fdopen(fd, "wb")
+        self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb") if self.compress else self._raw
+        self._has_rows = False
+        if self.fmt == "csv":
+            self._stream.write(self._encode(dict(zip(EXPORT_COLUMNS, EXPORT_COLUMNS))))
+
+    def _size(self):
+        self._stream.flush()
+        return self._raw.tell()
+
+    def _close_part(self):
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+        self._raw = self._stream = None
+
+# Application Search
+SEARCH_TOKEN_REGEX = re.compile(r'[a-z0-9]+')
+STEAM_LINK_STOPWORDS = {"http", "https", "www", "steamcommunity", "com", "id", "profiles"}
+# Field weights used for ranking; a token keeps its highest-weighted field
+SEARCH_FIELD_WEIGHTS = {
+    "user_id": 5,
+    "applicant_name": 3,
+    "steam_link": 3,
+    "processed_by": 2,
+    "processed_by_name": 2,
+    "reason": 1
+}
+
+def search_tokens(text):
+    return SEARCH_TOKEN_REGEX.findall(str(text).lower())
+
+class ApplicationIndex:
+    """Inverted index of token → {user_id: field weight}, updated per application on every write"""
+
+    def __init__(self):
+        self._postings = {}
+        self._doc_tokens = {}
+        self._submitted = {}
+
+    def __len__(self):
+        return len(self._doc_tokens)
+
+    def rebuild(self, apps):
+        self._postings, self._doc_tokens, self._submitted = {}, {}, {}
+        for user_id, app in apps.items():
+            self.update(user_id, app)
+
+    def update(self, user_id, app):
+        self.remove(user_id)
+        weights = {}
+        for field, weight in SEARCH_FIELD_WEIGHTS.items():
+            value = user_id if field == "user_id" else app.get(field)
+            if not value:
+                continue
+            tokens = search_tokens(value)
+            if field == "steam_link":
+                tokens = [token for token in tokens if token not in STEAM_LINK_STOPWORDS]
+            for token in tokens:
+                weights[token] = max(weights.get(token, 0), weight)
+        for token, weight in weights.items():
+            self._postings.setdefault(token, {})[user_id] = weight
+        self._doc_tokens[user_id] = tuple(weights)
+        self._submitted[user_id] = app.get("submitted_at", "")
+
+    def remove(self, user_id):
+        self._submitted.pop(user_id, None)
+        for token in self._doc_tokens.pop(user_id, ()):
+            posting = self._postings[token]
+            del posting[user_id]
+            if not posting:
+                del self._postings[token]
+
+    def search(self, query, predicate=None, limit=10):
+        """Return (total matches, up to `limit` (score, user_id) pairs best first).
+
+        Scores sum each token's field weight scaled by its inverse document frequency.
+        A filter-only search (no tokens) ranks matches newest submission first.
+        """
+        tokens = set(search_tokens(query))
+        if not tokens:
+            matches = [user_id for user_id in self._doc_tokens if not predicate or predicate(user_id)]
+            newest = heapq.nlargest(limit, matches, key=self._submitted.__getitem__)
+            return len(matches), [(0, user_id) for user_id in newest]
+        postings = [self._postings.get(token) for token in tokens]
+        if not all(postings):
+            return 0, []
+        postings.sort(key=len)
+        total = len(self._doc_tokens)
+        idf = [math.log(1 + total / len(posting)) for posting in postings]
+        results = []
+        for user_id in postings[0]:
+            if not all(user_id in posting for posting in postings[1:]):
+                continue
+            if predicate and not predicate(user_id):
+                continue
+            score = sum(posting[user_id] * weight for posting, weight in zip(postings, idf))
+            results.append((score, user_id))
+        return len(results), heapq.nlargest(limit, results)
+
+app_index = ApplicationIndex()
+
+# Reapplication Cooldowns
+class CooldownIndex:
+    """User ID → cooldown expiry (epoch seconds), with a min-heap of expiries for eviction.
+
+    Lookups are a dict hit; entries are evicted from the front of the heap as they expire.
+    """
+
+    def __init__(self):
+        self._expiry = {}
+        self._heap = []
+
+    def __len__(self):
+        return len(self._expiry)
+
+    def set(self, user_id, expires_at):
+        self._expiry[user_id] = expires_at
+        heapq.heappush(self._heap, (expires_at, user_id))
+
+    def clear(self, user_id):
+        # The heap entry goes stale and is dropped when it reaches the front
+        return self._expiry.pop(user_id, None) is not None
+
+    def remaining(self, user_id, now=None):
+        """Seconds left on the user's cooldown, or 0 if none"""
+        now = time.time() if now is None else now
+        self._evict(now)
+        expires_at = self._expiry.get(user_id)
+        return expires_at - now if expires_at and expires_at > now else 0
+
+    def rebuild(self, apps, cooldown, now=None):
+        """Recreate the index from declined applications' `processed_at`, skipping lifted cooldowns"""
+        now = time.time() if now is None else now
+        self._expiry = {}
+        for user_id, app in apps.items():
+            if app["status"] == "declined" and "processed_at" in app and "cooldown_cleared_at" not in app:
+                expires_at = datetime.fromisoformat(app["processed_at"]).timestamp() + cooldown
+                if expires_at > now:
+                    self._expiry[user_id] = expires_at
+        self._heap = [(expires_at, user_id) for user_id, expires_at in self._expiry.items()]
+        heapq.heapify(self._heap)
+
+    def _evict(self, now):
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, user_id = heapq.heappop(self._heap)
+            if self._expiry.get(user_id) == expires_at:
+                del self._expiry[user_id]
+
+cooldowns = CooldownIndex()
+
+def start_cooldown(user_id):
+    cooldowns.set(str(user_id), time.time() + config.get("application_cooldown", 86400))
+
 def has_staff_role(member_or_ctx):
     member = member_or_ctx if isinstance(member_or_ctx, discord.Member) else member_or_ctx.author
     return any(role.name.lower() in config["staff_roles"] for role in member.roles)
 
+async def resolve_member(guild, user_id):
+    """Get a member from cache, fetching on demand when the lazy cache policy missed them"""
+    member = guild.get_member(int(user_id))
+    if member is None:
+        try:
+            member = await guild.fetch_member(int(user_id))
+        except discord.NotFound:
+            return None
+    return member
+
+async def cache_pending_applicants(guild):
+    """Pull members with pending applications into the cache so staff actions skip a fetch"""
+    pending = [int(uid) for uid, app in applications.items() if app["status"] == "pending"]
+    for start in range(0, len(pending), 100):
+        try:
+            await guild.query_members(user_ids=pending[start:start + 100], cache=True)
+        except Exception as e:
+            print(f"Error caching applicants in {guild.name}: {str(e)}")
+
+def command_tree_fingerprint():
+    """Hash of the slash command definitions, used to skip syncing an unchanged tree"""
+    signature = [
+        (command.qualified_name, command.description,
+         [(param.name, str(param.type), param.required) for param in getattr(command, "parameters", [])])
+        for command in bot.tree.walk_commands()
+    ]
+    return hashlib.sha256(json.dumps(sorted(signature)).encode("utf-8")).hexdigest()
+
+async def sync_application_commands(force=False):
+    """Sync slash commands with Discord when their definitions changed since the last sync"""
+    fingerprint = command_tree_fingerprint()
+    if not force and os.path.exists(COMMAND_SYNC_FILE):
+        with open(COMMAND_SYNC_FILE, 'r') as f:
+            if f.read().strip() == fingerprint:
+                return False
+    await bot.tree.sync()
+    with open(COMMAND_SYNC_FILE, 'w') as f:
+        f.write(fingerprint)
+    return True
+
+async def reply_private(ctx, embed):
+    """DM the author, or reply ephemerally when invoked as a slash command"""
+    if ctx.interaction:
+        await ctx.send(embed=embed, ephemeral=True)
+    else:
+        await ctx.author.send(embed=embed)
+
 def create_embed(title, description, color, **kwargs):
     embed = discord.Embed(title=title, description=description, color=color)
     if kwargs.get('timestamp', False):
@@ -106,6 +788,63 @@ def create_embed(title, description, color, **kwargs):
             )
     return embed
 
+# Embed Templates
+class EmbedTemplate:
+    """Fixed title/description/color embed built once at import.
+
+    `embed` is a shared instance for sending as-is and must not be mutated;
+    `clone()` returns a fresh copy from the frozen payload for adding fields.
+    """
+    __slots__ = ("payload", "embed")
+
+    def __init__(self, title, description, color):
+        self.embed = discord.Embed(title=title, description=description, color=color)
+        self.payload = MappingProxyType(self.embed.to_dict())
+
+    def clone(self):
+        return discord.Embed.from_dict(dict(self.payload))
+
+TEMPLATES = {
+    "approved_dm": EmbedTemplate("🎉 Approved!", "You now have access to the server.", discord.Color.green()),
+    "already_member": EmbedTemplate("❌ Already Member", "You already have the member role.", discord.Color.red()),
+    "pending": EmbedTemplate("⏳ Pending", "You have a pending application.", discord.Color.orange()),
+    "rules": EmbedTemplate("📋 Application", "Confirm you agree to the rules.", discord.Color.blue()),
+    "rules_cancelled": EmbedTemplate("❌ Cancelled", "Rules not confirmed.", discord.Color.red()),
+    "process": EmbedTemplate("📋 Process", "Provide:\n- Steam profile link\n- Project Zomboid hours", discord.Color.blue()),
+    "timeout": EmbedTemplate("⏱️ Timeout", "Restart with !apply.", discord.Color.red()),
+    "dm_error": EmbedTemplate("📬 DM Error", "Enable DMs from server members.", discord.Color.red()),
+    "step_steam": EmbedTemplate("📝 Step 1/3", "Provide Steam profile link.", discord.Color.blue()),
+    "invalid_steam": EmbedTemplate("❌ Invalid", "Valid Steam link required.", discord.Color.red()),
+    "step_hours": EmbedTemplate("📝 Step 2/3", "Enter Project Zomboid hours.", discord.Color.blue()),
+    "application_cancelled": EmbedTemplate("❌ Cancelled", "Application cancelled.", discord.Color.red()),
+    "apply_channel_missing": EmbedTemplate("⚠️ Error", "Application channel not found.", discord.Color.red()),
+    "send_failed": EmbedTemplate("⚠️ Error", "Failed to send.", discord.Color.red()),
+    "no_pending": EmbedTemplate("❌ Error", "No pending application.", discord.Color.red()),
+    "no_role_permission": EmbedTemplate("⚠️ Error", "No role permission.", discord.Color.red()),
+    "no_applications": EmbedTemplate("📋 Applications", "None found.", discord.Color.blue()),
+    "command_not_found": EmbedTemplate("❌ Error", "Command not found.", discord.Color.red()),
+    "help": EmbedTemplate("🤖 Commands", "Available commands:", discord.Color.blue())
+}
+
+async def send_applicant_dm(member, embed):
+    """DM an applicant; returns False when the DM could not be delivered"""
+    try:
+        await member.send(embed=embed)
+        return True
+    except discord.HTTPException:
+        return False
+
+def queue_applicant_dm(member, embed):
+    """Queue an applicant DM behind interactive work and return its future"""
+    return outbound.submit(RequestPriority.APPLICATION_DM, lambda: send_applicant_dm(member, embed), route="user.dm")
+
+def create_decline_dm_embed(reason):
+    return create_embed(
+        title="📋 Update",
+        description=f"Application declined.\n**Reason:** {reason or 'None'}",
+        color=discord.Color.red()
+    )
+
 def format_time_remaining(seconds):
     hours = int(seconds // 3600)
     minutes = int((seconds % 3600) // 60)
@@ -113,18 +852,62 @@ def format_time_remaining(seconds):
         return f"{hours}h {minutes}m"
     return f"{minutes}m"
 
+# RCON
+async def run_whitelist_command(member, application_data):
+    """Run the configured RCON whitelist command for an approved applicant; None if disabled"""
+    template = config.get("rcon_whitelist_command")
+    if not rcon or not template:
+        return None
+    # The link is applicant input: only a plain profile URL is accepted, and it is rebuilt
+    # from the captured parts so nothing else reaches the server console
+    match = STEAM_PROFILE_REGEX.fullmatch(application_data.get("steam_link", ""))
+    if not match:
+        raise RconError("Steam link is not a plain profile URL")
+    kind, steam_id = match.groups()
+    if not RCON_ARGUMENT_REGEX.fullmatch(member.name):
+        raise RconError("Username contains characters unsafe for RCON")
+    response = await rcon.command(template.format(
+        name=member.name,
+        user_id=member.id,
+        steam_link=f"https://steamcommunity.com/{kind}/{steam_id}",
+        steam_id=steam_id
+    ))
+    return response.strip() or "Done"
+
+async def whitelist_applicant(member, application_data, embed):
+    """Add the whitelist outcome to `embed`; returns True if a field was added"""
+    try:
+        response = await run_whitelist_command(member, application_data)
+        if not response:
+            return False
+        embed.add_field(name="🗝️ Whitelist", value=response[:1024], inline=True)
+    except RconError as e:
+        embed.add_field(name="⚠️ Whitelist", value=str(e), inline=True)
+    return True
+
 # Server Status Functions
 async def get_server_status():
+    global last_status_poll
     try:
         server_address = (config["server_ip"], int(config["server_port"]))
         info = await asyncio.wait_for(a2s.ainfo(server_address), timeout=5)
         players = await asyncio.wait_for(a2s.aplayers(server_address), timeout=5)
+        last_status_poll = datetime.now(pytz.UTC)
+        player_names = [p.name for p in players]
+        player_count = info.player_count
+        if rcon:
+            # RCON's list is authoritative; A2S often reports blank or stale names
+            try:
+                player_names = parse_rcon_players(await rcon.command("players"))
+                player_count = len(player_names)
+            except RconError as e:
+                print(f"RCON player list error: {str(e)}")
         return {
             "online": True,
-            "player_count": info.player_count,
+            "player_count": player_count,
             "max_players": info.max_players,
             "server_name": config["server_name"],
-            "players": players
+            "players": player_names
         }
     except asyncio.TimeoutError:
         print(f"Server status timeout: {config['server_ip']}:{config['server_port']}")
@@ -147,6 +930,45 @@ async def get_server_status():
             "error": str(e)
         }
 
+def pack_field_values(lines, budget=EMBED_TOTAL_LIMIT, max_fields=PLAYER_LIST_MAX_COLUMNS):
+    """Pack lines into as few field values as fit Discord's field and embed limits.
+
+    Lines that do not fit are summarised as "+N more" on the last field, and a
+    single line longer than a field is truncated to fit.
+    """
+    reserve = len(f"\n+{len(lines)} more")
+    line_limit = EMBED_FIELD_VALUE_LIMIT - reserve
+    columns, current = [], []
+    current_len = used = shown = 0
+    for line in lines:
+        if len(line) > line_limit:
+            line = line[:line_limit - 1] + "…"
+        cost = len(line) + (1 if current else 0)
+        if current and current_len + cost + reserve > EMBED_FIELD_VALUE_LIMIT:
+            if len(columns) + 1 >= max_fields:
+                break
+            columns.append("\n".join(current))
+            current, current_len, cost = [], 0, len(line)
+        if used + cost + reserve > budget:
+            break
+        current.append(line)
+        current_len += cost
+        used += cost
+        shown += 1
+    if current:
+        columns.append("\n".join(current))
+
+    hidden = len(lines) - shown
+    if hidden:
+        if columns:
+            columns[-1] += f"\n+{hidden} more"
+        else:
+            columns.append(f"+{hidden} more")
+    return columns
+
+def pack_player_columns(names, budget=EMBED_TOTAL_LIMIT):
+    return pack_field_values([f"• {discord.utils.escape_markdown(name)}" for name in names if name], budget)
+
 def create_status_embed(status, requester=None):
     color = discord.Color.green() if status["online"] else discord.Color.red()
     status_text = "🟢 Online" if status["online"] else "🔴 Offline"
@@ -158,25 +980,27 @@ def create_status_embed(status, requester=None):
         title=f"🎮 {status['server_name']} Status",
         description=description,
         color=color,
-        timestamp=True
+        timestamp=True,
+        footer=f"Requested by {requester}" if requester else "Auto-updated"
     )
     
     if status["online"] and status["player_count"] > 0:
-        player_names = [p.name for p in status["players"]]
-        player_list = "\n".join(f"• {name}" for name in player_names[:15])
-        embed.add_field(
-            name=f"👥 Players ({status['player_count']})",
-            value=player_list or "No players",
-            inline=False
-        )
+        header = f"👥 Players ({status['player_count']})"
+        # Leave room for the column names so the whole embed stays under Discord's limit
+        budget = EMBED_TOTAL_LIMIT - len(embed) - len(header) - PLAYER_LIST_MAX_COLUMNS
+        columns = pack_player_columns(status["players"], budget)
+        for index, column in enumerate(columns or ["No players"]):
+            embed.add_field(
+                name=header if index == 0 else "\u200b",
+                value=column,
+                inline=len(columns) > 1
+            )
     
-    embed.set_footer(text=f"Requested by {requester}" if requester else "Auto-updated")
     return embed
 
 # Tasks
 @tasks.loop(minutes=1.0)
 async def update_server_status():
-    global server_status_message
     channel = bot.get_channel(int(config["status_channel_id"]))
     if not channel:
         print(f"Status channel {config['status_channel_id']} not found")
@@ -184,6 +1008,16 @@ async def update_server_status():
 
     status = await get_server_status()
     embed = create_status_embed(status)
+    # Queued behind staff actions; a newer update replaces one that has not been sent yet
+    outbound.submit(
+        RequestPriority.STATUS,
+        lambda: publish_status_embed(channel, embed),
+        route=f"message.edit:{channel.id}",
+        key="status_embed"
+    )
+
+async def publish_status_embed(channel, embed):
+    global server_status_message
     try:
         if server_status_message:
             await server_status_message.edit(embed=embed)
@@ -193,7 +1027,6 @@ async def update_server_status():
         print(f"Error updating status: {str(e)}")
         server_status_message = None
 
-
 @tasks.loop(minutes=1.0)
 async def clean_status_channel():
     """Delete messages in the status channel after 15 minutes, except the status embed."""
@@ -210,17 +1043,39 @@ async def clean_status_channel():
             # Check if message is older than 15 minutes
             message_age = (datetime.now(pytz.UTC) - message.created_at).total_seconds()
             if message_age >= 900:  # 15 minutes = 900 seconds
-                try:
-                    await message.delete()
-                except discord.Forbidden:
-                    print(f"Error: No permission to delete message {message.id} in channel {channel.id}")
-                except discord.NotFound:
-                    print(f"Error: Message {message.id} already deleted")
+                # Keyed by message so a delete still queued from the last pass is not doubled
+                outbound.submit(
+                    RequestPriority.CLEANUP,
+                    lambda message=message: delete_status_message(message),
+                    route=f"message.delete:{channel.id}",
+                    key=f"delete:{message.id}"
+                )
     except Exception as e:
         print(f"Error cleaning status channel: {str(e)}")
 
+async def delete_status_message(message):
+    try:
+        await message.delete()
+    except discord.Forbidden:
+        print(f"Error: No permission to delete message {message.id} in channel {message.channel.id}")
+    except discord.NotFound:
+        print(f"Error: Message {message.id} already deleted")
+    except Exception as e:
+        print(f"Error deleting message {message.id}: {str(e)}")
+
+@tasks.loop(hours=1.0)
+async def archive_processed_applications():
+    try:
+        archived = await archive_expired_applications()
+        if archived:
+            print(f"Archived {archived} processed applications")
+    except Exception as e:
+        print(f"Error archiving applications: {str(e)}")
+
+BACKGROUND_LOOPS = (update_server_status, clean_status_channel, archive_processed_applications)
+
 # Commands
-@bot.command()
+@bot.hybrid_command()
 @commands.cooldown(1, config.get("status_command_cooldown", 30), commands.BucketType.user)
 async def status(ctx):
     async with ctx.typing():
@@ -302,8 +1157,31 @@ class ApproveDeclineView(discord.ui.View):
         if not has_staff_role(interaction.user):
             await interaction.response.send_message("❌ Staff only", ephemeral=True)
             return False
+        if self._is_stale():
+            await self._reject_stale(interaction)
+            return False
         return True
 
+    def _is_stale(self):
+        """True once this application was processed elsewhere (e.g. a bulk command), cleared or replaced"""
+        record = applications.get(str(self.applicant_id), {})
+        return (record.get("status") != "pending"
+                or record.get("submitted_at") != self.application_data.get("submitted_at"))
+
+    async def _reject_stale(self, interaction):
+        self.action_taken = True
+        for item in self.children:
+            item.disabled = True
+        await interaction.response.send_message("❌ Already processed", ephemeral=True)
+        try:
+            await outbound.run(
+                RequestPriority.INTERACTIVE,
+                lambda: interaction.message.edit(view=self),
+                route=f"message.edit:{interaction.channel_id}"
+            )
+        except discord.HTTPException as e:
+            print(f"Error disabling stale application buttons: {str(e)}")
+
     @discord.ui.button(label="✅ Approve", style=discord.ButtonStyle.green)
     async def approve_button(self, interaction, _button):
         await self._process_application(interaction, "approved")
@@ -314,33 +1192,64 @@ class ApproveDeclineView(discord.ui.View):
         await interaction.response.send_modal(modal)
 
     async def _process_application(self, interaction, action, reason=None):
+        # A decline modal can be submitted after the application was processed elsewhere
+        if self.action_taken or self._is_stale():
+            await self._reject_stale(interaction)
+            return
         self.action_taken = True
         for item in self.children:
             item.disabled = True
+        # Acknowledge inside Discord's 3s window; the outcome is edited in below
+        await outbound.run(RequestPriority.INTERACTIVE, lambda: interaction.response.defer())
 
         try:
             user = await bot.fetch_user(self.applicant_id)
             guild = interaction.guild
-            member = guild.get_member(int(self.applicant_id))
+            member = await resolve_member(guild, self.applicant_id)
+            if self._is_stale():
+                embed = create_embed(title="❌ Already processed", description="This application was processed elsewhere.", color=discord.Color.red())
+                await outbound.run(RequestPriority.INTERACTIVE, lambda: interaction.edit_original_response(embed=embed, view=self))
+                return
             embed = self._create_approval_embed(user, member, interaction.user) if action == "approved" else self._create_decline_embed(user, interaction.user, reason)
             
             if action == "approved":
                 await self._handle_approval(member, embed)
-            else:
-                await self._handle_decline(member, reason)
             
             applications[str(self.applicant_id)]["status"] = action
             applications[str(self.applicant_id)]["processed_by"] = str(interaction.user.id)
+            applications[str(self.applicant_id)]["processed_by_name"] = interaction.user.name
             applications[str(self.applicant_id)]["processed_at"] = datetime.now().isoformat()
             if reason:
                 applications[str(self.applicant_id)]["reason"] = reason
             save_applications()
+            app_index.update(str(self.applicant_id), applications[str(self.applicant_id)])
+            if action == "declined":
+                start_cooldown(self.applicant_id)
             
-            await interaction.response.edit_message(embed=embed, view=self)
+            await outbound.run(RequestPriority.INTERACTIVE, lambda: interaction.edit_original_response(embed=embed, view=self))
         except Exception as e:
             print(f"Error processing application: {str(e)}")
             embed = create_embed(title="⚠️ Error", description=str(e), color=discord.Color.red())
-            await interaction.response.edit_message(embed=embed, view=self)
+            await outbound.run(RequestPriority.INTERACTIVE, lambda: interaction.edit_original_response(embed=embed, view=self))
+            return
+
+        if member:
+            # Sent after staff have their answer; approvals edit in the DM and whitelist results
+            dm_embed = TEMPLATES["approved_dm"].embed if action == "approved" else create_decline_dm_embed(reason)
+            dm = queue_applicant_dm(member, dm_embed)
+            if action == "approved":
+                spawn(self._follow_up_approval(interaction, embed, member, dm))
+
+    async def _follow_up_approval(self, interaction, embed, member, dm):
+        try:
+            changed = await whitelist_applicant(member, self.application_data, embed)
+            if await dm is False:
+                embed.add_field(name="📬 DM", value="Could not DM user", inline=True)
+                changed = True
+            if changed:
+                await interaction.edit_original_response(embed=embed, view=self)
+        except Exception as e:
+            print(f"Error updating processed application: {str(e)}")
 
     def _create_approval_embed(self, user, _member, staff_member):
         embed = create_embed(
@@ -374,32 +1283,16 @@ class ApproveDeclineView(discord.ui.View):
         member_role = discord.utils.get(member.guild.roles, name=config["member_role"])
         if member_role:
             try:
-                await member.add_roles(member_role)
+                await outbound.run(
+                    RequestPriority.INTERACTIVE,
+                    lambda: member.add_roles(member_role),
+                    route=f"member.roles:{member.guild.id}"
+                )
                 embed.add_field(name="🎭 Role", value=member_role.mention, inline=True)
             except discord.Forbidden:
                 embed.add_field(name="⚠️ Error", value="No role permission", inline=True)
         else:
             embed.add_field(name="⚠️ Error", value=f"Role {config['member_role']} not found", inline=True)
-        try:
-            await member.send(embed=create_embed(
-                title="🎉 Approved!",
-                description="You now have access to the server.",
-                color=discord.Color.green()
-            ))
-        except discord.Forbidden:
-            embed.add_field(name="📬 DM", value="Could not DM user", inline=True)
-
-    async def _handle_decline(self, member, reason):
-        if not member:
-            return
-        try:
-            await member.send(embed=create_embed(
-                title="📋 Update",
-                description=f"Application declined.\n**Reason:** {reason or 'None'}",
-                color=discord.Color.red()
-            ))
-        except discord.Forbidden:
-            pass
 
 class DeclineReasonModal(discord.ui.Modal, title="📝 Decline Reason"):
     reason = discord.ui.TextInput(
@@ -420,13 +1313,92 @@ class DeclineReasonModal(discord.ui.Modal, title="📝 Decline Reason"):
         await self.view._process_application(interaction, "declined", self.reason.value or "None")
 
 # Bot Events
+@bot.event
+async def setup_hook():
+    """One-time initialisation after login, before the gateway connects; reconnects skip it"""
+    global rcon
+    with startup_phase("applications"):
+        # Keep the JSON parse off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, load_applications)
+        cooldowns.rebuild(applications, config.get("application_cooldown", 86400))
+    with startup_phase("search_index"):
+        await asyncio.get_running_loop().run_in_executor(None, app_index.rebuild, applications)
+    outbound.start()
+    loop_monitor.start()
+    if APPLICATION_COMMANDS:
+        with startup_phase("command_sync"):
+            if await sync_application_commands():
+                print("Synced application commands")
+    if int(config.get("rcon_port", 0)) and os.getenv('RCON_PASSWORD'):
+        rcon = RconClient(config.get("rcon_host") or config["server_ip"], int(config["rcon_port"]), os.getenv('RCON_PASSWORD'))
+    if int(config.get("health_port", DEFAULT_CONFIG["health_port"])):
+        with startup_phase("health_server"):
+            await start_health_server()
+
 @bot.event
 async def on_ready():
+    """Fires on the first connect and again whenever the gateway has to re-identify"""
+    global ready_count
+    ready_count += 1
     print(f'🤖 {bot.user} connected!')
-    load_applications()
     await bot.change_presence(activity=discord.Game(name="Project Zomboid"))
-    update_server_status.start()
-    clean_status_channel.start()
+    for loop in BACKGROUND_LOOPS:
+        if not loop.is_running():
+            loop.start()
+    if ready_count > 1:
+        return
+
+    startup_phases["gateway_ready"] = round(time.monotonic() - STARTED_AT, 3)
+    ready_report = f"Ready in {startup_phases['gateway_ready']:.1f}s ({MEMBER_CACHE_POLICY} member cache)"
+    if resource:
+        ready_report += f", peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB"
+    print(ready_report)
+    print("Startup phases:", startup_phases)
+    if MEMBER_CACHE_POLICY != "full":
+        for guild in bot.guilds:
+            spawn(cache_pending_applicants(guild))
+
+# Health Endpoint
+def health_report():
+    latency = bot.latency
+    loops = {
+        loop.coro.__name__: {"running": loop.is_running(), "failed": loop.failed()}
+        for loop in BACKGROUND_LOOPS
+    }
+    ready = bot.is_ready() and not bot.is_closed() and all(state["running"] for state in loops.values())
+    return {
+        "ready": ready,
+        "ready_count": ready_count,
+        "uptime_seconds": round(time.monotonic() - STARTED_AT),
+        "gateway_latency_ms": round(latency * 1000) if math.isfinite(latency) else None,
+        "loops": loops,
+        "last_status_poll": last_status_poll.isoformat() if last_status_poll else None,
+        "outbound_queued": outbound.queued(),
+        "rcon_connected": rcon.connected if rcon else None,
+        "loop_lag_ms": loop_monitor.percentiles(),
+        "startup_phases": startup_phases
+    }
+
+async def handle_health(_request):
+    return web.json_response(health_report())
+
+async def handle_ready(_request):
+    report = health_report()
+    return web.json_response(report, status=200 if report["ready"] else 503)
+
+async def start_health_server():
+    """Serve /health (liveness) and /ready (traffic gating) for the process orchestrator"""
+    app = web.Application()
+    app.router.add_get("/health", handle_health)
+    app.router.add_get("/ready", handle_ready)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    host, port = config.get("health_host", DEFAULT_CONFIG["health_host"]), int(config.get("health_port", DEFAULT_CONFIG["health_port"]))
+    try:
+        await web.TCPSite(runner, host, port).start()
+        print(f"Health endpoint listening on {host}:{port}")
+    except OSError as e:
+        print(f"Error starting health endpoint on {host}:{port}: {str(e)}")
 
 @bot.event
 async def on_member_join(member):
@@ -461,23 +1433,23 @@ async def on_member_join(member):
     )
     
     try:
-        await welcome_channel.send(embed=embed)
+        await outbound.run(
+            RequestPriority.APPLICATION_DM,
+            lambda: welcome_channel.send(embed=embed),
+            route=f"message.send:{welcome_channel.id}"
+        )
     except discord.Forbidden:
         print(f"Error: Bot lacks permission to send messages in channel {welcome_channel.name} (ID: {config['welcome_channel_id']})")
     except Exception as e:
         print(f"Error sending welcome message to channel {welcome_channel.name if welcome_channel else 'unknown'} (ID: {config['welcome_channel_id']}): {str(e)}")
 
 # Application Commands
-@bot.command()
+@bot.hybrid_command()
 async def apply(ctx):
     member_role = discord.utils.get(ctx.guild.roles, name=config["member_role"])
     if member_role in ctx.author.roles:
-        embed = create_embed(
-            title="❌ Already Member",
-            description="You already have the member role.",
-            color=discord.Color.red()
-        )
-        await ctx.author.send(embed=embed)
+        embed = TEMPLATES["already_member"].embed
+        await reply_private(ctx, embed)
         return
 
     if ctx.channel.name != config["apply_channel"]:
@@ -489,46 +1461,43 @@ async def apply(ctx):
         await ctx.send(embed=embed, delete_after=10)
         return
     
-    try:
-        await ctx.message.delete()
-    except discord.Forbidden:
-        pass
+    if not ctx.interaction:
+        try:
+            await ctx.message.delete()
+        except discord.Forbidden:
+            pass
     
     user_id = str(ctx.author.id)
     if user_id in applications and applications[user_id]["status"] == "pending":
+        embed = TEMPLATES["pending"].embed
+        await reply_private(ctx, embed)
+        return
+
+    remaining = cooldowns.remaining(user_id)
+    if remaining:
         embed = create_embed(
-            title="⏳ Pending",
-            description="You have a pending application.",
+            title="⏳ Cooldown",
+            description=f"You can reapply in {format_time_remaining(remaining)}.",
             color=discord.Color.orange()
         )
-        await ctx.author.send(embed=embed)
+        await reply_private(ctx, embed)
         return
     
+    if ctx.interaction:
+        await ctx.send("📬 Check your DMs.", ephemeral=True)
     try:
         dm_channel = await ctx.author.create_dm()
-        rules_embed = create_embed(
-            title="📋 Application",
-            description="Confirm you agree to the rules.",
-            color=discord.Color.blue()
-        )
+        rules_embed = TEMPLATES["rules"].embed
         view = RulesConfirmationView(ctx.author.id)
         await dm_channel.send(embed=rules_embed, view=view)
         
         await view.wait()
         if not view.confirmed:
-            embed = create_embed(
-                title="❌ Cancelled",
-                description="Rules not confirmed.",
-                color=discord.Color.red()
-            )
+            embed = TEMPLATES["rules_cancelled"].embed
             await dm_channel.send(embed=embed)
             return
         
-        await dm_channel.send(embed=create_embed(
-            title="📋 Process",
-            description="Provide:\n- Steam profile link\n- Project Zomboid hours",
-            color=discord.Color.blue()
-        ))
+        await dm_channel.send(embed=TEMPLATES["process"].embed)
         
         steam_link = await get_steam_profile(ctx.author, dm_channel)
         if not steam_link:
@@ -544,42 +1513,26 @@ async def apply(ctx):
         await submit_application(ctx, steam_link, hours_played)
         
     except asyncio.TimeoutError:
-        embed = create_embed(
-            title="⏱️ Timeout",
-            description="Restart with !apply.",
-            color=discord.Color.red()
-        )
+        embed = TEMPLATES["timeout"].embed
         await dm_channel.send(embed=embed)
     except discord.Forbidden:
-        embed = create_embed(
-            title="📬 DM Error",
-            description="Enable DMs from server members.",
-            color=discord.Color.red()
-        )
+        embed = TEMPLATES["dm_error"].embed
         await ctx.send(f"{ctx.author.mention}", embed=embed, delete_after=15)
 
 async def get_steam_profile(user, dm_channel):
     def check(m):
         return m.author == user and m.channel == dm_channel
     
-    embed = create_embed(
-        title="📝 Step 1/3",
-        description="Provide Steam profile link.",
-        color=discord.Color.blue()
-    )
+    embed = TEMPLATES["step_steam"].embed
     await dm_channel.send(embed=embed)
     
     while True:
         try:
             steam_msg = await bot.wait_for('message', check=check, timeout=300.0)
             steam_link = steam_msg.content.strip()
-            if STEAM_PROFILE_REGEX.match(steam_link):
+            if STEAM_PROFILE_REGEX.fullmatch(steam_link):
                 return steam_link
-            embed = create_embed(
-                title="❌ Invalid",
-                description="Valid Steam link required.",
-                color=discord.Color.red()
-            )
+            embed = TEMPLATES["invalid_steam"].embed
             await dm_channel.send(embed=embed)
         except asyncio.TimeoutError:
             return None
@@ -588,11 +1541,7 @@ async def get_hours_played(user, dm_channel):
     def check(m):
         return m.author == user and m.channel == dm_channel
     
-    embed = create_embed(
-        title="📝 Step 2/3",
-        description="Enter Project Zomboid hours.",
-        color=discord.Color.blue()
-    )
+    embed = TEMPLATES["step_hours"].embed
     await dm_channel.send(embed=embed)
     
     try:
@@ -616,33 +1565,35 @@ async def confirm_application(user, dm_channel, steam_link, hours_played):
     
     await view.wait()
     if not view.confirmed:
-        embed = create_embed(
-            title="❌ Cancelled",
-            description="Application cancelled.",
-            color=discord.Color.red()
-        )
+        embed = TEMPLATES["application_cancelled"].embed
         await dm_channel.send(embed=embed)
         return False
     return True
 
 async def submit_application(ctx, steam_link, hours_played):
     user_id = str(ctx.author.id)
+    previous = applications.get(user_id)
     application_data = {
         "steam_link": steam_link,
         "hours_played": hours_played,
         "status": "pending",
-        "submitted_at": datetime.now().isoformat()
+        "submitted_at": datetime.now().isoformat(),
+        "applicant_name": ctx.author.name
     }
+    # Replace the record before awaiting so retention cannot pick up the previous one too
     applications[user_id] = application_data
+    app_index.update(user_id, application_data)
+    if previous and previous["status"] != "pending":
+        # Keep the earlier decision for appeals instead of overwriting it
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, append_to_archive, [(user_id, previous)])
+        except OSError as e:
+            print(f"Error archiving previous application for {user_id}: {str(e)}")
     save_applications()
     
     apply_channel = discord.utils.get(ctx.guild.text_channels, name=config["apply_channel"])
     if not apply_channel:
-        embed = create_embed(
-            title="⚠️ Error",
-            description="Application channel not found.",
-            color=discord.Color.red()
-        )
+        embed = TEMPLATES["apply_channel_missing"].embed
         await ctx.author.send(embed=embed)
         return
     
@@ -669,22 +1620,182 @@ async def submit_application(ctx, steam_link, hours_played):
         await ctx.author.send(embed=success_embed)
     except Exception as e:
         print(f"Error sending application: {str(e)}")
-        embed = create_embed(title="⚠️ Error", description="Failed to send.", color=discord.Color.red())
+        embed = TEMPLATES["send_failed"].embed
         await ctx.author.send(embed=embed)
 
 # Staff Commands
-@bot.command()
+async def parse_member_ids(ctx, text):
+    """Split leading members from the rest of the text, e.g. a decline reason.
+
+    Mentions and IDs are read directly; any other word is looked up as a member name.
+    """
+    words = text.split()
+    user_ids = []
+    for index, word in enumerate(words):
+        match = MEMBER_REFERENCE_REGEX.fullmatch(word)
+        if match:
+            user_ids.append(match.group(1) or match.group(2))
+            continue
+        try:
+            member = await commands.MemberConverter().convert(ctx, word)
+        except commands.BadArgument:
+            return user_ids, " ".join(words[index:])
+        user_ids.append(str(member.id))
+    return user_ids, ""
+
+async def process_bulk(ctx, user_ids, action, reason=None):
+    """Approve or decline a batch of pending applications and report one summary embed.
+
+    Role changes run with bounded concurrency through the outbound scheduler, the store is
+    written once as soon as they finish, and only then are DMs and whitelisting sent.
+    """
+    guild = ctx.guild
+    member_role = discord.utils.get(guild.roles, name=config["member_role"])
+    if action == "approved" and not member_role:
+        embed = create_embed(
+            title="⚠️ Error",
+            description=f"Role {config['member_role']} not found.",
+            color=discord.Color.red()
+        )
+        await ctx.send(embed=embed, delete_after=10)
+        return
+
+    outcomes = {}
+    batch = []
+    for user_id in dict.fromkeys(user_ids):
+        app = applications.get(user_id)
+        if not app or app["status"] != "pending":
+            outcomes[user_id] = "❌ No pending application"
+        else:
+            batch.append(user_id)
+
+    semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+    members = {}
+
+    async def apply_role(user_id):
+        try:
+            async with semaphore:
+                member = await resolve_member(guild, user_id)
+                if action == "approved":
+                    if not member:
+                        outcomes[user_id] = "⚠️ Not in server"
+                        return
+                    await outbound.run(
+                        RequestPriority.INTERACTIVE,
+                        lambda: member.add_roles(member_role),
+                        route=f"member.roles:{guild.id}"
+                    )
+            members[user_id] = member
+        except discord.Forbidden:
+            outcomes[user_id] = "⚠️ No role permission"
+        except Exception as e:
+            print(f"Bulk {action} error for {user_id}: {str(e)}")
+            outcomes[user_id] = f"⚠️ {str(e)[:100]}"
+
+    async def notify(user_id, member):
+        notes = []
+        try:
+            dm_embed = TEMPLATES["approved_dm"].embed if action == "approved" else create_decline_dm_embed(reason)
+            dm = queue_applicant_dm(member, dm_embed)
+            if action == "approved":
+                try:
+                    async with semaphore:
+                        await run_whitelist_command(member, applications.get(user_id, {}))
+                except RconError:
+                    notes.append("whitelist failed")
+            if await dm is False:
+                notes.append("DM failed")
+        except Exception as e:
+            print(f"Bulk {action} notification error for {user_id}: {str(e)}")
+            notes.append("notification failed")
+        if notes:
+            outcomes[user_id] += f" ({', '.join(notes)})"
+
+    async with ctx.typing():
+        await asyncio.gather(*(apply_role(user_id) for user_id in batch))
+
+        # Persist the batch as soon as the roles are in place, before any slow DMs
+        processed_at = datetime.now().isoformat()
+        processed = [user_id for user_id in members if applications.get(user_id, {}).get("status") == "pending"]
+        for user_id in processed:
+            app = applications[user_id]
+            app.update(status=action, processed_by=str(ctx.author.id), processed_by_name=ctx.author.name, processed_at=processed_at)
+            if reason:
+                app["reason"] = reason
+            outcomes[user_id] = "✅ Approved" if action == "approved" else "❌ Declined"
+        for user_id in members.keys() - set(processed):
+            outcomes[user_id] = "❌ Processed elsewhere"
+        if processed:
+            save_applications()
+            for user_id in processed:
+                app_index.update(user_id, applications[user_id])
+                if action == "declined":
+                    start_cooldown(user_id)
+
+        await asyncio.gather(*(notify(user_id, members[user_id]) for user_id in processed if members[user_id]))
+
+    lines = [f"<@{user_id}> — {outcome}" for user_id, outcome in outcomes.items()]
+    embed = create_embed(
+        title="✅ Bulk Approve" if action == "approved" else "❌ Bulk Decline",
+        description=f"{len(processed)}/{len(outcomes)} {action} by {ctx.author.mention}.",
+        color=discord.Color.green() if action == "approved" else discord.Color.red(),
+        timestamp=True
+    )
+    if reason:
+        embed.add_field(name="📝 Reason", value=reason[:1024], inline=False)
+    for index, value in enumerate(pack_field_values(lines, EMBED_TOTAL_LIMIT - len(embed) - 64, max_fields=5)):
+        embed.add_field(name="Results" if index == 0 else "\u200b", value=value, inline=False)
+    await ctx.send(embed=embed)
+
+@bot.hybrid_command()
 @commands.check(has_staff_role)
-async def approve(ctx, member: discord.Member):
-    user_id = str(member.id)
-    if user_id not in applications or applications[user_id]["status"] != "pending":
+async def approve(ctx, *, members: str):
+    user_ids, unparsed = await parse_member_ids(ctx, members)
+    if unparsed or not user_ids:
         embed = create_embed(
-            title="❌ Error",
-            description="No pending application.",
+            title="❌ Invalid",
+            description=f"Unrecognised member: {unparsed or members}",
             color=discord.Color.red()
         )
         await ctx.send(embed=embed, delete_after=10)
         return
+    if len(user_ids) > 1:
+        await process_bulk(ctx, user_ids, "approved")
+        return
+
+    member = await resolve_member(ctx.guild, user_ids[0])
+    if not member:
+        embed = create_embed(title="❌ Error", description="Member not found.", color=discord.Color.red())
+        await ctx.send(embed=embed, delete_after=10)
+        return
+    await approve_member(ctx, member)
+
+@bot.hybrid_command(name="approve-all")
+@commands.check(has_staff_role)
+async def approve_all(ctx):
+    pending = [user_id for user_id, app in applications.items() if app["status"] == "pending"]
+    if not pending:
+        embed = TEMPLATES["no_pending"].embed
+        await ctx.send(embed=embed, delete_after=10)
+        return
+    await process_bulk(ctx, pending, "approved")
+
+@bot.hybrid_command(name="decline-many")
+@commands.check(has_staff_role)
+async def decline_many(ctx, *, members: str):
+    user_ids, reason = await parse_member_ids(ctx, members)
+    if not user_ids:
+        embed = create_embed(title="❌ Invalid", description="Mention at least one member.", color=discord.Color.red())
+        await ctx.send(embed=embed, delete_after=10)
+        return
+    await process_bulk(ctx, user_ids, "declined", reason or "None")
+
+async def approve_member(ctx, member):
+    user_id = str(member.id)
+    if user_id not in applications or applications[user_id]["status"] != "pending":
+        embed = TEMPLATES["no_pending"].embed
+        await ctx.send(embed=embed, delete_after=10)
+        return
     
     application_data = applications[user_id]
     try:
@@ -698,11 +1809,17 @@ async def approve(ctx, member: discord.Member):
             await ctx.send(embed=embed, delete_after=10)
             return
         
-        await member.add_roles(member_role)
+        await outbound.run(
+            RequestPriority.INTERACTIVE,
+            lambda: member.add_roles(member_role),
+            route=f"member.roles:{ctx.guild.id}"
+        )
         applications[user_id]["status"] = "approved"
         applications[user_id]["processed_by"] = str(ctx.author.id)
+        applications[user_id]["processed_by_name"] = ctx.author.name
         applications[user_id]["processed_at"] = datetime.now().isoformat()
         save_applications()
+        app_index.update(user_id, applications[user_id])
         
         embed = create_embed(
             title="✅ Approved",
@@ -714,37 +1831,28 @@ async def approve(ctx, member: discord.Member):
                 {"name": "⏱️ Hours", "value": application_data["hours_played"], "inline": True}
             ]
         )
-        await ctx.send(embed=embed)
-        try:
-            await member.send(embed=create_embed(
-                title="🎉 Approved!",
-                description="You have access to the server.",
-                color=discord.Color.green()
-            ))
-        except discord.Forbidden:
+        message = await ctx.send(embed=embed)
+        # RCON can be slow or down, so its result is edited into the summary afterwards
+        dm = queue_applicant_dm(member, TEMPLATES["approved_dm"].embed)
+        changed = await whitelist_applicant(member, application_data, embed)
+        if await dm is False:
             embed.add_field(name="📬 DM", value="Could not DM user", inline=True)
-            await ctx.send(embed=embed)
+            changed = True
+        if changed:
+            await message.edit(embed=embed)
     except discord.Forbidden:
-        embed = create_embed(
-            title="⚠️ Error",
-            description="No role permission.",
-            color=discord.Color.red()
-        )
+        embed = TEMPLATES["no_role_permission"].embed
         await ctx.send(embed=embed, delete_after=10)
     except Exception as e:
         print(f"Approve error: {str(e)}")
         embed = create_embed(title="⚠️ Error", description=str(e), color=discord.Color.red())
         await ctx.send(embed=embed, delete_after=10)
 
-@bot.command()
+@bot.hybrid_command(name="applications")
 @commands.check(has_staff_role)
-async def applications(ctx):
+async def list_applications(ctx):
     if not applications:
-        embed = create_embed(
-            title="📋 Applications",
-            description="None found.",
-            color=discord.Color.blue()
-        )
+        embed = TEMPLATES["no_applications"].embed
         await ctx.send(embed=embed, delete_after=10)
         return
 
@@ -829,7 +1937,7 @@ async def applications(ctx):
         view.children[1].disabled = True
     await ctx.send(embed=embed, view=view)
 
-@bot.command()
+@bot.hybrid_command()
 @commands.check(has_staff_role)
 async def clear(ctx, status: str):
     status = status.lower()
@@ -843,39 +1951,293 @@ async def clear(ctx, status: str):
         await ctx.send(embed=embed, delete_after=10)
         return
 
-    global applications
-    count = sum(1 for app in applications.values() if app["status"] == status)
+    matching = [(uid, app) for uid, app in applications.items() if app["status"] == status]
+    # Declines on an active cooldown are kept, since cooldowns are rebuilt from the store on restart
+    cleared = [(uid, app) for uid, app in matching if not cooldowns.remaining(uid)]
+    kept = len(matching) - len(cleared)
+    count = len(cleared)
     if count == 0:
+        note = f" ({kept} kept while on cooldown)" if kept else ""
         embed = create_embed(
             title="📋 Clear",
-            description=f"No {status} applications.",
+            description=f"No {status} applications to clear{note}.",
             color=discord.Color.blue()
         )
         await ctx.send(embed=embed, delete_after=10)
         return
 
-    applications = {uid: app for uid, app in applications.items() if app["status"] != status}
+    # Cleared records stay available to !archive lookup for appeals
+    detach_applications(cleared)
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, append_to_archive, cleared)
+    except OSError as e:
+        restore_applications(cleared)
+        print(f"Error archiving cleared applications: {str(e)}")
+        embed = create_embed(title="⚠️ Error", description="Could not archive applications; nothing cleared.", color=discord.Color.red())
+        await ctx.send(embed=embed, delete_after=10)
+        return
     save_applications()
     embed = create_embed(
         title="✅ Cleared",
-        description=f"Cleared {count} {status} applications.",
+        description=f"Cleared {count} {status} applications (kept in the archive)."
+                    + (f"\n{kept} still on cooldown were not cleared." if kept else ""),
+        color=discord.Color.green()
+    )
+    await ctx.send(embed=embed)
+
+@bot.hybrid_command()
+@commands.check(has_staff_role)
+async def export(ctx, status: str = "all", since: str = None, fmt: str = "csv"):
+    status, fmt = status.lower(), fmt.lower()
+    compress = fmt.endswith(".gz")
+    fmt = fmt[:-3] if compress else fmt
+    valid_statuses = ["all", "pending", "approved", "declined"]
+    error = None
+    if status not in valid_statuses:
+        error = f"Status must be one of: {', '.join(valid_statuses)}"
+    elif fmt not in ("csv", "jsonl"):
+        error = "Format must be csv, jsonl, csv.gz or jsonl.gz"
+    elif since:
+        try:
+            since = datetime.fromisoformat(since).date().isoformat()
+        except ValueError:
+            error = "Since must be a date like 2025-01-31"
+    if error:
+        embed = create_embed(title="❌ Invalid", description=error, color=discord.Color.red())
+        await ctx.send(embed=embed, delete_after=10)
+        return
+
+    loop = asyncio.get_running_loop()
+    max_bytes = (ctx.guild.filesize_limit if ctx.guild else 8 * 1024 * 1024) - UPLOAD_OVERHEAD
+    writer = ExportWriter(fmt, compress, max_bytes)
+    count = 0
+    try:
+        async with ctx.typing():
+            rows = iter_export_applications(status, since)
+            while True:
+                batch = list(itertools.islice(rows, EXPORT_BATCH_SIZE))
+                if not batch:
+                    break
+                names = await resolve_usernames(batch)
+                records = []
+                for (user_id, app), name in zip(batch, names):
+                    record = {column: app.get(column, "") for column in EXPORT_COLUMNS}
+                    record.update(user_id=user_id, username=name)
+                    records.append(record)
+                await loop.run_in_executor(None, writer.write_rows, records)
+                count += len(records)
+            paths = await loop.run_in_executor(None, writer.close)
+
+        if not count:
+            embed = create_embed(
+                title="📤 Export",
+                description=f"No {status} applications to export.",
+                color=discord.Color.blue()
+            )
+            await ctx.send(embed=embed, delete_after=10)
+            return
+
+        stamp = datetime.now().strftime("%Y%m%d-%H%M")
+        for part, path in enumerate(paths, start=1):
+            suffix = f"-part{part}" if len(paths) > 1 else ""
+            filename = f"applications-{status}-{stamp}{suffix}.{fmt}" + (".gz" if compress else "")
+            content = f"📤 Exported {count} {status} applications" if part == 1 else None
+            await ctx.send(content=content, file=discord.File(path, filename=filename))
+    finally:
+        await loop.run_in_executor(None, writer.cleanup)
+
+@bot.hybrid_command()
+@commands.check(has_staff_role)
+async def appsearch(ctx, *, query: str):
+    """Search applications; filter with status:<status>, since:<YYYY-MM-DD>, until:<YYYY-MM-DD>"""
+    terms, filters = [], {}
+    for word in query.split():
+        key, sep, value = word.partition(":")
+        if sep and key.lower() in ("status", "since", "until"):
+            filters[key.lower()] = value.lower()
+        else:
+            terms.append(word)
+
+    def matches(user_id):
+        app = applications[user_id]
+        submitted = app["submitted_at"][:10]
+        return (
+            filters.get("status", app["status"]) == app["status"]
+            and submitted >= filters.get("since", submitted)
+            and submitted <= filters.get("until", submitted)
+        )
+
+    started = time.perf_counter()
+    total, results = app_index.search(" ".join(terms), predicate=matches)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if not results:
+        embed = create_embed(
+            title="🔎 Search",
+            description=f"No applications match `{discord.utils.escape_markdown(query)}`.",
+            color=discord.Color.blue()
+        )
+        await ctx.send(embed=embed, delete_after=10)
+        return
+
+    status_emoji = {"pending": "⏳", "approved": "✅", "declined": "❌"}
+    fields = []
+    for _score, user_id in results:
+        app = applications[user_id]
+        value = (
+            f"**Status:** {status_emoji.get(app['status'], '❓')} {app['status'].capitalize()}\n"
+            f"**Steam:** {app['steam_link']}\n"
+            f"**Submitted:** {app['submitted_at'][:10]}"
+        )
+        if "reason" in app:
+            value += f"\n**Reason:** {app['reason'][:200]}"
+        name = app.get("applicant_name", "Unknown")
+        fields.append({"name": f"{name} ({user_id})", "value": value, "inline": False})
+    shown = f"Showing {len(results)} of {total} results" if total > len(results) else f"{total} result(s)"
+    embed = create_embed(
+        title="🔎 Search",
+        description=f"{shown} for `{discord.utils.escape_markdown(query)}`",
+        color=discord.Color.blue(),
+        fields=fields,
+        footer=f"Searched {len(app_index)} applications in {elapsed_ms:.1f} ms"
+    )
+    await ctx.send(embed=embed)
+
+@bot.hybrid_command()
+@commands.check(has_staff_role)
+async def profile(ctx, seconds: int = 10):
+    """Sample the event loop for a few seconds and upload a flamegraph-compatible stack file"""
+    global profiling
+    if profiling or not loop_monitor.loop_thread_id:
+        embed = create_embed(title="⏳ Busy", description="A profile is already running.", color=discord.Color.orange())
+        await ctx.send(embed=embed, delete_after=10)
+        return
+    seconds = max(1, min(seconds, PROFILE_MAX_SECONDS))
+    profiling = True
+    try:
+        async with ctx.typing():
+            # Sampled from a worker thread so the loop keeps running normally meanwhile
+            collapsed = await asyncio.get_running_loop().run_in_executor(
+                None, sample_stacks, loop_monitor.loop_thread_id, seconds
+            )
+    finally:
+        profiling = False
+    lag = loop_monitor.percentiles() or {}
+    filename = f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.collapsed"
+    await ctx.send(
+        content=f"🔬 {seconds}s profile, loop lag p95 {lag.get('p95', 'n/a')} ms / max {lag.get('max', 'n/a')} ms",
+        file=discord.File(io.BytesIO(collapsed.encode("utf-8")), filename=filename)
+    )
+
+@bot.hybrid_command(name="synccommands")
+@commands.check(has_staff_role)
+async def sync_commands(ctx):
+    if not APPLICATION_COMMANDS:
+        embed = create_embed(title="❌ Error", description="Application commands are disabled.", color=discord.Color.red())
+        await ctx.send(embed=embed, delete_after=10)
+        return
+    await sync_application_commands(force=True)
+    embed = create_embed(title="✅ Synced", description="Application commands synced.", color=discord.Color.green())
+    await ctx.send(embed=embed)
+
+@bot.hybrid_command(name="resetcooldown")
+@commands.check(has_staff_role)
+async def reset_cooldown(ctx, user: discord.User):
+    user_id = str(user.id)
+    if not cooldowns.clear(user_id):
+        embed = create_embed(
+            title="⏳ Cooldown",
+            description=f"{user.mention} has no active cooldown.",
+            color=discord.Color.blue()
+        )
+        await ctx.send(embed=embed, delete_after=10)
+        return
+    if user_id in applications:
+        # Persisted so the rebuild at startup does not reinstate it
+        applications[user_id]["cooldown_cleared_at"] = datetime.now().isoformat()
+        applications[user_id]["cooldown_cleared_by"] = str(ctx.author.id)
+        save_applications()
+    embed = create_embed(
+        title="✅ Cooldown Reset",
+        description=f"{user.mention} can reapply now.",
+        color=discord.Color.green()
+    )
+    await ctx.send(embed=embed)
+
+@bot.hybrid_group(invoke_without_command=True)
+@commands.check(has_staff_role)
+async def archive(ctx):
+    embed = create_embed(
+        title="🗄️ Archive",
+        description=(
+            f"Processed applications older than {config.get('archive_after_days', 30)} days are archived hourly.\n"
+            "Use `!archive lookup @user` or `!archive run`."
+        ),
+        color=discord.Color.blue()
+    )
+    await ctx.send(embed=embed, delete_after=30)
+
+@archive.command(name="lookup")
+@commands.check(has_staff_role)
+async def archive_lookup(ctx, user: discord.User):
+    async with ctx.typing():
+        records = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: list(itertools.islice(iter_archive(str(user.id)), 10))
+        )
+    if not records:
+        embed = create_embed(
+            title="🗄️ Archive",
+            description=f"No archived applications for {user.mention}.",
+            color=discord.Color.blue()
+        )
+        await ctx.send(embed=embed, delete_after=10)
+        return
+
+    status_emoji = {"pending": "⏳", "approved": "✅", "declined": "❌"}
+    fields = []
+    for record in records:
+        value = (
+            f"**Status:** {status_emoji.get(record['status'], '❓')} {record['status'].capitalize()}\n"
+            f"**Steam:** {record['steam_link']}\n"
+            f"**Hours:** {record['hours_played']}\n"
+            f"**Processed:** {record.get('processed_at', 'N/A')[:10]}"
+        )
+        if "processed_by" in record:
+            value += f"\n**Processed By:** <@{record['processed_by']}>"
+        if "reason" in record:
+            value += f"\n**Reason:** {record['reason'][:300]}"
+        fields.append({"name": f"Submitted {record['submitted_at'][:10]}", "value": value, "inline": False})
+    embed = create_embed(
+        title="🗄️ Archive",
+        description=f"{len(records)} archived application(s) for {user.mention}",
+        color=discord.Color.blue(),
+        fields=fields
+    )
+    await ctx.send(embed=embed)
+
+@archive.command(name="run")
+@commands.check(has_staff_role)
+async def archive_run(ctx):
+    archived = await archive_expired_applications()
+    embed = create_embed(
+        title="🗄️ Archive",
+        description=f"Archived {archived} applications.",
         color=discord.Color.green()
     )
     await ctx.send(embed=embed)
 
-@bot.command()
+@bot.hybrid_command()
 async def help(ctx, command_name: str = None):
     if command_name:
         command = bot.get_command(command_name)
         if not command:
-            embed = create_embed(title="❌ Error", description="Command not found.", color=discord.Color.red())
+            embed = TEMPLATES["command_not_found"].embed
             await ctx.send(embed=embed)
             return
         embed = create_embed(title=f"📖 {command.name}", description=command.help or "No description.", color=discord.Color.blue())
         await ctx.send(embed=embed)
         return
     
-    embed = create_embed(title="🤖 Commands", description="Available commands:", color=discord.Color.blue())
+    embed = TEMPLATES["help"].clone()
     commands_list = [
         ("!apply", "Apply to join"),
         ("!status", "Check server status"),
@@ -883,9 +2245,17 @@ async def help(ctx, command_name: str = None):
     ]
     if has_staff_role(ctx):
         commands_list.extend([
-            ("!approve @user", "Approve application"),
+            ("!approve <member> …", "Approve one or more applications (mention, ID or name)"),
+            ("!approve-all", "Approve every pending application"),
+            ("!decline-many <member> … [reason]", "Decline several applications (mention, ID or name)"),
             ("!applications", "View applications"),
-            ("!clear <status>", "Clear applications")
+            ("!clear <status>", "Clear applications"),
+            ("!resetcooldown @user", "Lift reapplication cooldown"),
+            ("!synccommands", "Force a slash command sync"),
+            ("!profile [seconds]", "Profile the bot and upload a flamegraph stack file"),
+            ("!appsearch <query>", "Search applications (status:, since:, until: filters)"),
+            ("!export [status] [since] [csv|jsonl][.gz]", "Export applications as a file"),
+            ("!archive lookup @user", "Search archived applications")
         ])
     
     for cmd, desc in commands_list:
@@ -0,0 +1,130 @@
+"""Source RCON client used by DiscordBotComp for player lists and whitelisting"""
+import asyncio
+import struct
+import time
+
+RCON_AUTH = 3
+RCON_AUTH_RESPONSE = 2
+RCON_EXEC_COMMAND = 2
+RCON_RECONNECT_DELAY = 10
+
+class RconError(Exception):
+    pass
+
+def encode_rcon_packet(request_id, packet_type, body):
+    payload = struct.pack("<ii", request_id, packet_type) + body.encode("utf-8") + b"\x00\x00"
+    return struct.pack("<i", len(payload)) + payload
+
+async def read_rcon_packet(reader):
+    size, = struct.unpack("<i", await reader.readexactly(4))
+    data = await reader.readexactly(size)
+    request_id, packet_type = struct.unpack("<ii", data[:8])
+    return request_id, packet_type, data[8:-2].decode("utf-8", "replace")
+
+class RconClient:
+    """One persistent Source RCON connection shared by all callers.
+
+    The connection is opened and authenticated on first use and reopened on the next
+    command after it drops. Commands are pipelined: each gets a request id, and a single
+    reader task resolves whichever caller's id a response carries. Responses are expected
+    in one packet, which covers Project Zomboid's command output.
+    """
+
+    def __init__(self, host, port, password, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+        self._read_task = None
+        self._pending = {}
+        self._last_id = 0
+        self._lock = None
+        self._retry_at = 0
+
+    @property
+    def connected(self):
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def command(self, command, timeout=None):
+        """Run a console command and return its response text"""
+        await self._ensure_connected()
+        request_id = self._next_id()
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._writer.write(encode_rcon_packet(request_id, RCON_EXEC_COMMAND, command))
+            await self._writer.drain()
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            raise RconError(f"RCON command timed out: {command}")
+        except (OSError, ConnectionError) as e:
+            self._disconnect(e)
+            raise RconError(f"RCON connection lost: {str(e)}")
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def close(self):
+        self._disconnect(RconError("RCON client closed"))
+        if self._read_task:
+            self._read_task.cancel()
+
+    def _next_id(self):
+        # Ids stay positive; -1 is the server's authentication failure marker
+        self._last_id = self._last_id % 0x7FFFFFFF + 1
+        return self._last_id
+
+    async def _ensure_connected(self):
+        if self.connected:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.connected:
+                return
+            if time.monotonic() < self._retry_at:
+                raise RconError("RCON unavailable, retrying shortly")
+            try:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+                writer.write(encode_rcon_packet(self._next_id(), RCON_AUTH, self.password))
+                await writer.drain()
+                # Servers may send an empty response value ahead of the auth response
+                while True:
+                    request_id, packet_type, _body = await asyncio.wait_for(read_rcon_packet(reader), self.timeout)
+                    if packet_type == RCON_AUTH_RESPONSE:
+                        break
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                self._retry_at = time.monotonic() + RCON_RECONNECT_DELAY
+                raise RconError(f"RCON connect to {self.host}:{self.port} failed: {str(e) or type(e).__name__}")
+            if request_id == -1:
+                writer.close()
+                self._retry_at = time.monotonic() + RCON_RECONNECT_DELAY
+                raise RconError("RCON authentication failed")
+            self._reader, self._writer = reader, writer
+            self._read_task = asyncio.create_task(self._read_responses(reader))
+
+    async def _read_responses(self, reader):
+        try:
+            while True:
+                request_id, _packet_type, body = await read_rcon_packet(reader)
+                future = self._pending.get(request_id)
+                if future and not future.done():
+                    future.set_result(body)
+        except (OSError, asyncio.IncompleteReadError, struct.error) as e:
+            # A reader left over from a replaced connection must not tear down the new one
+            if self._reader is reader:
+                self._disconnect(e)
+
+    def _disconnect(self, reason):
+        if self._writer:
+            self._writer.close()
+        self._reader = self._writer = None
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(RconError(f"RCON connection lost: {str(reason)}"))
+        self._pending.clear()
+
+def parse_rcon_players(response):
+    """Parse Project Zomboid's `players` output: a header line then one "-name" per player"""
+    return [line[1:].strip() for line in response.splitlines() if line.startswith("-") and line[1:].strip()]
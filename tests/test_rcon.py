@@ -0,0 +1,122 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rcon import (RCON_AUTH, RCON_AUTH_RESPONSE, RCON_EXEC_COMMAND, RconClient, RconError,
+                  encode_rcon_packet, parse_rcon_players, read_rcon_packet)
+
+PASSWORD = "secret"
+
+
+class StandInServer:
+    """Local Source RCON server: checks the password and answers commands via `handler`"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.connections = 0
+        self.server = None
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def _serve(self, reader, writer):
+        self.connections += 1
+        try:
+            request_id, packet_type, body = await read_rcon_packet(reader)
+            assert packet_type == RCON_AUTH
+            # Real servers send an empty response value ahead of the auth response
+            writer.write(encode_rcon_packet(request_id, 0, ""))
+            writer.write(encode_rcon_packet(request_id if body == PASSWORD else -1, RCON_AUTH_RESPONSE, ""))
+            await writer.drain()
+            await self.handler(reader, writer)
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+
+async def echo_commands(reader, writer):
+    while True:
+        request_id, packet_type, body = await read_rcon_packet(reader)
+        assert packet_type == RCON_EXEC_COMMAND
+        writer.write(encode_rcon_packet(request_id, 0, f"ran {body}"))
+        await writer.drain()
+
+
+def test_pipelined_responses_reach_their_callers():
+    async def answer_in_reverse(reader, writer):
+        # Hold both commands, then answer the second one first
+        first = await read_rcon_packet(reader)
+        second = await read_rcon_packet(reader)
+        for request_id, _packet_type, body in (second, first):
+            writer.write(encode_rcon_packet(request_id, 0, f"ran {body}"))
+        await writer.drain()
+        await echo_commands(reader, writer)
+
+    async def scenario():
+        async with StandInServer(answer_in_reverse) as server:
+            client = RconClient("127.0.0.1", server.port, PASSWORD, timeout=2)
+            try:
+                results = await asyncio.gather(client.command("players"), client.command("save"))
+            finally:
+                await client.close()
+        assert results == ["ran players", "ran save"]
+        assert server.connections == 1
+
+    asyncio.run(scenario())
+
+
+def test_reconnects_after_the_server_drops_the_connection():
+    async def answer_once(reader, writer):
+        request_id, _packet_type, body = await read_rcon_packet(reader)
+        writer.write(encode_rcon_packet(request_id, 0, f"ran {body}"))
+        await writer.drain()
+
+    async def scenario():
+        async with StandInServer(answer_once) as server:
+            client = RconClient("127.0.0.1", server.port, PASSWORD, timeout=2)
+            try:
+                assert await client.command("players") == "ran players"
+                # Let the client's reader notice the close
+                for _ in range(50):
+                    if not client.connected:
+                        break
+                    await asyncio.sleep(0.01)
+                assert await client.command("save") == "ran save"
+            finally:
+                await client.close()
+        assert server.connections == 2
+
+    asyncio.run(scenario())
+
+
+def test_wrong_password_raises_and_backs_off():
+    async def scenario():
+        async with StandInServer(echo_commands) as server:
+            client = RconClient("127.0.0.1", server.port, "wrong", timeout=2)
+            with pytest.raises(RconError, match="authentication failed"):
+                await client.command("players")
+            # Retries wait out the reconnect delay instead of hammering the server
+            with pytest.raises(RconError, match="retrying shortly"):
+                await client.command("players")
+        assert server.connections == 1
+
+    asyncio.run(scenario())
+
+
+def test_parse_rcon_players():
+    response = "Players connected (2):\n-Alice\n-Bob \n-\n"
+    assert parse_rcon_players(response) == ["Alice", "Bob"]